@@ -1,4 +1,4 @@
 from custom_mwclient.wiki_authentication import WikiAuth, WikiggAuth
-from custom_mwclient.wiki_client import WikiClient
+from custom_mwclient.wiki_client import WikiClient, gather_api_continue
 from custom_mwclient.clients.wikigg_client import WikiggClient
 from custom_mwclient.clients.fandom_client import FandomClient
@@ -1,44 +1,63 @@
+import functools
+import random
 import time
 
 from mwclient.page import Page
-from mwclient.errors import AssertUserFailedError, APIError, ProtectedPageError
+from mwclient.errors import APIError, ProtectedPageError
 
+from custom_mwclient.errors import RetriedLoginAndStillFailed
 from custom_mwclient.wiki_client import WikiClient
 
 
+def _is_badtoken(exc: Exception) -> bool:
+    return isinstance(exc, APIError) and exc.code == 'badtoken'
+
+
+def _retry_after_relog(failure_type: str, retry_if=lambda exc: True):
+    """Decorate a page action of `FandomClient` to retry it after logging in again.
+
+    The page must be the first argument of the decorated method. If the action
+    raises one of the client's `write_errors` and `retry_if(error)` is true,
+    the action is retried via `FandomClient._retry_login_action`.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, page: Page, *args, **kwargs):
+            try:
+                return func(self, page, *args, **kwargs)
+            except self.write_errors as exc:
+                if not retry_if(exc):
+                    raise
+            # reuse the page object instead of loading it again; it only needs to use
+            # this client, whose tokens are refreshed by the relog
+            page.site = self
+            return self._retry_login_action(func, failure_type, self, page, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
 class FandomClient(WikiClient):
     """Extension of `WikiClient` for Fandom-specific stuff."""
 
+    HOST_SUFFIX = '.fandom.com'
+
     def __init__(self, wikiname: str, lang: str = "en", max_retries: int = 3,
-                 retry_interval: int = 10, **kwargs):
+                 retry_interval: int = 10, backoff_cap: int = 300, **kwargs):
         url = f"https://{wikiname}.fandom.com"
         if lang != "en":
             url += '/' + lang
         self.max_retries = max_retries
         self.retry_interval = retry_interval
+        # maximum seconds to wait before each retry: double the retry_interval on
+        # every retry, up to backoff_cap seconds (default interval is 10, default
+        # retries is 3, i.e. 10, 20, 40 seconds)
+        self._backoff_table = [min(retry_interval * 2 ** retry, backoff_cap) for retry in range(max_retries)]
         super().__init__(url, **kwargs)
 
 
-    def get_current_wiki_name(self) -> str:
-        """Return the name of the current host.
-
-        The `.fandom.com` part is omitted and `/<lang>` is appended, if the
-        language is not English.
-        """
-
-        api_result = self.api('query', meta='siteinfo', siprop='general')
-        api_result = api_result.get('query', {}).get('general', {})
-
-        sitename = api_result.get('servername', '')
-        sitename = sitename.replace('.fandom.com', '')
-
-        sitelang = api_result.get('lang')
-        if sitelang and sitelang != "en":
-            sitename += '/' + sitelang
-
-        return sitename
-
-
+    @_retry_after_relog('edit')
     def save(self, page: Page, text, summary=u'', minor=False, bot=True, section=None, log=None, **kwargs):
         """Performs a page edit, retrying the login once if the edit fails due to the user being logged out.
 
@@ -59,96 +78,55 @@ class FandomClient(WikiClient):
                 log(exc_info=True, s='Error while saving page {}: Page is protected!'.format(page.name))
             else:
                 raise
-        except self.write_errors:
-            return self._retry_login_action(self._retry_save, 'edit', page=page, text=text, summary=summary, minor=minor,
-                                     bot=bot, section=section, log=log, **kwargs)
-
-
-    def _retry_save(self, **kwargs):
-        old_page: Page = kwargs.pop('page')
-        # recreate the page object so that we're using the new site object, post-relog
-        page = self.pages[old_page.name]
-        text = kwargs.pop('text')
-        log = kwargs.pop('log')
-        try:
-            return page.save(text, **kwargs)
-        except ProtectedPageError:
-            if log:
-                log(exc_info=True, s='Error while saving page {}: Page is protected!'.format(page.name))
-            else:
-                raise
 
 
+    @_retry_after_relog('move', retry_if=_is_badtoken)
     def move(self, page: Page, new_title, reason='', move_talk=True, no_redirect=False, move_subpages=False, ignore_warnings=False):
-        try:
-            return page.move(new_title, reason=reason, move_talk=move_talk, no_redirect=no_redirect, move_subpages=move_subpages, ignore_warnings=ignore_warnings)
-        except APIError as e:
-            if e.code == 'badtoken':
-                return self._retry_login_action(self._retry_move, 'move', page=page, new_title=new_title, reason=reason, move_talk=move_talk, no_redirect=no_redirect, move_subpages=move_subpages, ignore_warnings=ignore_warnings)
-            else:
-                raise e
-
-
-    def _retry_move(self, **kwargs):
-        old_page: Page = kwargs.pop('page')
-        page = self.pages[old_page.name]
-        new_title = kwargs.pop('new_title')
-        return page.move(new_title, **kwargs)
+        return page.move(new_title, reason=reason, move_talk=move_talk, no_redirect=no_redirect, move_subpages=move_subpages, ignore_warnings=ignore_warnings)
 
 
+    @_retry_after_relog('delete', retry_if=_is_badtoken)
     def delete(self, page: Page, reason='', watch=False, unwatch=False, oldimage=False):
-        try:
-            return page.delete(reason=reason, watch=watch, unwatch=unwatch, oldimage=oldimage)
-        except APIError as e:
-            if e.code == 'badtoken':
-                return self._retry_login_action(self._retry_delete, 'delete', page=page, reason=reason,
-                                         watch=watch, unwatch=unwatch, oldimage=oldimage)
-            else:
-                raise e
-
+        return page.delete(reason=reason, watch=watch, unwatch=unwatch, oldimage=oldimage)
 
-    def _retry_delete(self, **kwargs):
-        old_page: Page = kwargs.pop('page')
-        page = self.pages[old_page.name]
-        return page.delete(**kwargs)
 
+    def _retry_login_action(self, f, failure_type, *args, **kwargs):
+        """Log in again and retry `f(*args, **kwargs)` until it succeeds or the retries run out.
 
-    def _retry_login_action(self, f, failure_type, **kwargs):
+        This is the single retry loop for all actions of the client.
+        """
+        # bind everything that the loop needs only once
+        write_errors = self.write_errors
+        relog = self.relog
+        backoff = self._backoff
         for retry in range(self.max_retries):
-            self.relog()
-            # don't sleep at all the first retry, and then increment in retry_interval intervals
-            # default interval is 10, default retries is 3
-            time.sleep((2 ** retry - 1) * self.retry_interval)
+            relog()
+            backoff(retry)
             try:
-                return f(**kwargs)
-            except self.write_errors:
+                return f(*args, **kwargs)
+            except write_errors:
                 continue
         raise RetriedLoginAndStillFailed(failure_type)
 
 
+    def _backoff(self, retry: int):
+        """Wait before the `retry`-th attempt of a failed action.
+
+        This only blocks the current thread: when the action was started via
+        one of the `*_async` methods, the event loop keeps running the other
+        pending requests in the meantime.
+        """
+        # "full jitter": wait a random time up to the maximum, so that clients which
+        # failed at the same time (e.g. during an outage) don't retry at the same time
+        time.sleep(random.uniform(0, self._backoff_table[retry]))
+
+
     def api(self, action, http_method='POST', *args, **kwargs):
         try:
             return super().api(action, http_method=http_method, *args, **kwargs)
         except self.write_errors:
-            for retry in range(self.max_retries):
-                self.relog()
-                # don't sleep at all the first retry, and then increment in retry_interval intervals
-                # default interval is 10, default retries is 3
-                time.sleep((2 ** retry - 1) * self.retry_interval)
-                try:
-                    return super().api(action, http_method=http_method, *args, **kwargs)
-                except self.write_errors:
-                    continue
-            raise RetriedLoginAndStillFailed('api')
+            return self._retry_login_action(super().api, 'api', action, http_method, *args, **kwargs)
 
 
     def relog(self):
         raise NotImplementedError
-
-
-class RetriedLoginAndStillFailed(AssertUserFailedError):
-    def __init__(self, action):
-        self.action = action
-
-    def __str__(self):
-        return "Tried to re-login but still failed. Attempted action: {}".format(self.action)
@@ -11,6 +11,8 @@ class WikiggClient(WikiClient):
     180 seconds (3 minutes) by default, in order to adapt to the slower servers.
     """
 
+    HOST_SUFFIX = '.wiki.gg'
+
     def __init__(self, wikiname: str, lang: str = "en", timeout: int = 180, **kwargs):
         url = f"https://{wikiname}.wiki.gg"
         if lang != "en":
@@ -18,28 +20,9 @@ class WikiggClient(WikiClient):
         # the timeout arg is just a nice interface (the same functionality can
         # be achieved by setting kwargs["connection_options"]["timeout"]), which
         # is why we have to merge the two (merge the timeout arg into the
-        # kwargs["connection_options"] dict)
-        kwargs.setdefault("connection_options", {}).setdefault("timeout", timeout)
+        # kwargs["connection_options"] dict). The dict is copied so that a dict
+        # passed by the caller isn't modified
+        connection_options = dict(kwargs.get("connection_options") or {})
+        connection_options.setdefault("timeout", timeout)
+        kwargs["connection_options"] = connection_options
         super().__init__(url, **kwargs)
-
-
-    def get_current_wiki_name(self) -> str:
-        """Return the name of the current host.
-
-        The `.wiki.gg` part is omitted and `/<lang>` is appended, if the
-        language is not English.
-
-        Example: For `terraria.wiki.gg/de`, return `terraria/de`.
-        """
-
-        api_result = self.api('query', meta='siteinfo', siprop='general')
-        api_result = api_result.get('query', {}).get('general', {})
-
-        sitename = api_result.get('servername', '')
-        sitename = sitename.replace('.wiki.gg', '')
-
-        sitelang = api_result.get('lang')
-        if sitelang and sitelang != "en":
-            sitename += '/' + sitelang
-
-        return sitename
@@ -1,12 +1,34 @@
+import sys
+
+from mwclient.errors import AssertUserFailedError
+
+
 class ApiContinueError(Exception):
     """Raised when an exception occurs during an api_continue call."""
+    __slots__ = ('loop_index', 'action', 'parameters')
+
     def __init__(self, loop_index: int, action: str, parameters: dict):
         self.loop_index = loop_index
-        self.action = action
+        self.action = sys.intern(action)
         self.parameters = parameters
-
-    def __str__(self):
-        return (
-            f"Error during api_continue call at index {self.loop_index}. "
-            f'Action was "{self.action}", parameters were {self.parameters}.'
+        super().__init__(
+            f"Error during api_continue call at index {loop_index}. "
+            f'Action was "{action}", parameters were {parameters}.'
         )
+
+    def __reduce__(self):
+        # slot values aren't part of the default pickle state of exceptions
+        return (self.__class__, (self.loop_index, self.action, self.parameters))
+
+
+class RetriedLoginAndStillFailed(AssertUserFailedError):
+    """Raised when an action still fails after logging in again."""
+    __slots__ = ('action',)
+
+    def __init__(self, action: str):
+        self.action = sys.intern(action)
+        # AssertUserFailedError.__init__ would set its own, unrelated message
+        self.args = (f"Tried to re-login but still failed. Attempted action: {action}",)
+
+    def __reduce__(self):
+        return (self.__class__, (self.action,))
@@ -1,4 +1,6 @@
 class Namespace(object):
+    __slots__ = ('id', 'name', 'canonical_name', 'aliases')
+
     def __init__(self, id_number: int = None, name: str = None, canonical_name: str = None, aliases: list = None):
         self.id = id_number
         self.name = name
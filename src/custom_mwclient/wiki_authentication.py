@@ -5,6 +5,10 @@ from pathlib import Path
 from typing import Literal
 
 
+# "credentials" directory in the root directory
+_CREDS_DIR = (Path(importlib.util.find_spec(__package__).origin).parents[2] / "credentials").resolve()
+
+
 class WikiAuth():
     """Holds username and password for a wiki.
 
@@ -25,8 +29,9 @@ class WikiAuth():
         """Return an auth object with credentials loaded from a file."""
         with open(filename, encoding='utf-8') as f:
             if filetype == 'plaintext':
-                username = f.readline().strip()
-                password = f.readline().strip()
+                # username on the first line, password on the second
+                lines = [line.strip() for line in f.read().splitlines()]
+                username, password = (lines + ['', ''])[:2]
             elif filetype == 'json':
                 jsonfile_contents = json.load(f)
                 username = jsonfile_contents['username']
@@ -60,11 +65,7 @@ class WikiggAuth(WikiAuth):
     def from_file(cls):
         """Return an auth object with credentials loaded from a file."""
         key = "ryebot"
-        file = (  # "credentials" directory in the root directory
-            Path(importlib.util.find_spec(__package__).origin).parents[2]
-            / "credentials" / f"wikigg_{key}.txt"
-        )
-        return super().from_file(file.resolve(), filetype="plaintext")
+        return super().from_file(_CREDS_DIR / f"wikigg_{key}.txt", filetype="plaintext")
 
     @classmethod
     def from_env(cls):
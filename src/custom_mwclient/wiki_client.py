@@ -1,21 +1,128 @@
+import asyncio
+import json
+from collections import defaultdict
+import threading
+import time
 import urllib.parse
 
+import requests
 from mwclient import Site
 from mwclient.page import Page
-from mwclient.errors import AssertUserFailedError, APIError
-from requests.exceptions import ReadTimeout
+from mwclient.errors import AssertUserFailedError, APIDisabledError, APIError, InvalidResponse, MwClientError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ReadTimeout, RequestException
+from urllib3.util.retry import Retry
 
 from custom_mwclient.errors import ApiContinueError
 from custom_mwclient.namespace import Namespace
 from custom_mwclient.wiki_authentication import WikiAuth
 
+# decode API responses with orjson if it is installed (pip install custom_mwclient[orjson])
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# errors that an API call can raise because of the network or the wiki, as opposed
+# to programming errors (mwclient's MaximumRetriesExceeded, APIError, etc. and
+# requests' ConnectionError, Timeout, etc.)
+_API_ERRORS = (MwClientError, RequestException)
+
+# errors after which a write action may succeed when retried
+WRITE_ERRORS = (AssertUserFailedError, ReadTimeout, APIError)
+
+# seconds after which cached wiki metadata (see `WikiClient._cache_get`) is fetched again
+_CACHE_TTL = 300
+# seconds after which the cached CSRF token is refreshed in the background
+_CSRF_TOKEN_TTL = 1200
+
+# revision properties that `get_last_rev` can return (fetched via rvprop='ids|timestamp')
+_LAST_REV_PROPS = frozenset(('revid', 'parentid', 'timestamp'))
+
+# retries of failed connection attempts in the HTTP adapter (see `_pooled_adapter`)
+_CONNECT_RETRIES = 3
+
+
+def _pooled_adapter() -> HTTPAdapter:
+    """Return an HTTP adapter with a connection pool sized for concurrent requests.
+
+    The adapter retries failures to establish a connection a few times with a
+    short backoff; the request has not been sent at that point, so this is safe
+    for edits too. Read timeouts and error responses are not retried here, but
+    left to mwclient's own retry logic, whose waits grow in steps of
+    `retry_timeout` (30 seconds by default).
+    """
+    retry = Retry(
+        total=None,
+        connect=_CONNECT_RETRIES,
+        read=False,
+        status=0,
+        other=0,
+        backoff_factor=0.5,
+    )
+    return HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retry)
+
+
+# adapter that is mounted on the HTTP sessions of all clients, so that a new client
+# doesn't need a new TCP+TLS handshake to a known host. Only the connections are
+# shared: each client keeps its own session, and thus its own cookies (i.e. login)
+_shared_adapter = _pooled_adapter()
+
+
+def _mount_shared_adapter(session: requests.Session):
+    """Make the session use the connection pool that is shared by all clients."""
+    session.mount('https://', _shared_adapter)
+    session.mount('http://', _shared_adapter)
+
+
+def _asyncify(method_name: str):
+    """Return a coroutine method that runs the method `method_name` in a worker thread."""
+
+    async def method(self, *args, **kwargs):
+        # look the method up on the instance, so that overrides in subclasses are used
+        return await asyncio.to_thread(getattr(self, method_name), *args, **kwargs)
+
+    method.__name__ = f'{method_name}_async'
+    method.__doc__ = f'Asynchronous version of `{method_name}`, executed in a worker thread.'
+    return method
+
 
 class WikiClient(Site):
     """Extension of mwclient's `Site`.
 
     >>> site = WikiClient(url, path, credentials)
+
+    The network-bound methods (`api`, `save`, `get_last_rev`, `api_continue`,
+    etc.) have asynchronous variants (`api_async` etc.), which allow issuing
+    many requests concurrently:
+    >>> await asyncio.gather(*(site.save_async(page, text) for page, text in batch))
     """
-    write_errors = (AssertUserFailedError, ReadTimeout, APIError)
+    # must always be a tuple, so that it can be used directly in `except` clauses;
+    # subclasses may replace it with another tuple
+    write_errors = WRITE_ERRORS
+
+    # part of the server name that is omitted by `get_current_wiki_name`
+    HOST_SUFFIX: str = ''
+
+    api_async = _asyncify('api')
+    save_async = _asyncify('save')
+    move_async = _asyncify('move')
+    delete_async = _asyncify('delete')
+    get_last_rev_async = _asyncify('get_last_rev')
+    get_last_rev_if_modified_async = _asyncify('get_last_rev_if_modified')
+    get_last_revs_async = _asyncify('get_last_revs')
+    pages_exist_async = _asyncify('pages_exist')
+    find_summary_in_revs_async = _asyncify('find_summary_in_revs')
+    namespace_names_to_ids_async = _asyncify('namespace_names_to_ids')
+    get_current_wiki_name_async = _asyncify('get_current_wiki_name')
+    get_current_wiki_user_async = _asyncify('get_current_wiki_user')
+    get_csrf_token_async = _asyncify('get_csrf_token')
+    api_continue_async = _asyncify('api_continue')
+    redirects_to_inclfragment_async = _asyncify('redirects_to_inclfragment')
+    redirects_to_inclfragment_many_async = _asyncify('redirects_to_inclfragment_many')
+    target_async = _asyncify('target')
+    target_many_async = _asyncify('target_many')
 
     def __init__(self,
         url: str,
@@ -24,14 +131,25 @@ class WikiClient(Site):
         max_retries: int = 3,
         **kwargs
     ):
+        # cache for wiki metadata: key -> (time of caching, value)
+        self._cache = {}
+        # held while the CSRF token is refreshed in the background
+        self._csrf_refresh_lock = threading.Lock()
         # always let kwargs["scheme"] override the scheme in "url"
         # (also, Site.__init__ requires the raw URL, without scheme)
         if url.startswith('https://'):
-            url = url[8:]
+            url = url.removeprefix('https://')
             kwargs.setdefault('scheme', 'https')
         elif url.startswith('http://'):
-            url = url[7:]
+            url = url.removeprefix('http://')
+            kwargs.setdefault('scheme', 'http')
+        own_session = kwargs.get('pool') is None
         super().__init__(url, path=path, max_retries=max_retries, **kwargs)
+        if own_session:
+            # the session was created by mwclient, with the default adapter
+            _mount_shared_adapter(self.connection)
+        # base URL for `fullurl`
+        self._index_url = f'{self.scheme}://{self.host}{self.path}index{self.ext}'
         self.login(credentials)
 
 
@@ -40,25 +158,96 @@ class WikiClient(Site):
         if credentials is None:
             return
         super().login(username=credentials.username, password=credentials.password)
+        self.clear_cache()
+
+
+    def _cache_get(self, key: str, ttl: float = None):
+        """Return the cached value for `key`, or `None` if there is none.
+
+        Values that were cached more than `ttl` seconds ago are discarded. With
+        a `ttl` of `None`, values never expire.
+        """
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        cache_time, value = cached
+        if ttl is not None and time.monotonic() - cache_time >= ttl:
+            # another thread (see the `*_async` methods) may have removed it already
+            self._cache.pop(key, None)
+            return None
+        return value
+
+
+    def _cache_set(self, key: str, value):
+        """Cache the `value` for `key`."""
+        self._cache[key] = (time.monotonic(), value)
+
+
+    def clear_cache(self):
+        """Discard all cached wiki metadata, so that it is queried again when needed.
+
+        This happens automatically on `login`.
+        """
+        self._cache.clear()
+
+
+    def raw_api(self, action, http_method='POST', retry_on_error=True, *args, **kwargs):
+        """Send a call to the API, like `mwclient.Site.raw_api`.
+
+        The response is decoded into plain dicts (with orjson if available)
+        instead of mwclient's `OrderedDict`s, which are much slower to build.
+        """
+        kwargs['action'] = action
+        kwargs['format'] = 'json'
+        data = self._query_string(*args, **kwargs)
+        res = self.raw_call('api', data, retry_on_error=retry_on_error, http_method=http_method)
+        try:
+            return _json_loads(res)
+        except ValueError:
+            if res.startswith('MediaWiki API is not enabled for this site.'):
+                raise APIDisabledError
+            raise InvalidResponse(res)
+
+
+    def api(self, action, http_method='POST', *args, **kwargs):
+        try:
+            return super().api(action, http_method, *args, **kwargs)
+        except APIError as exc:
+            if exc.code == 'badtoken':
+                # the cached CSRF token was rejected, e.g. because the session expired
+                self._cache.pop('csrf_token', None)
+            raise
 
 
     @property
     def namespaces__(self):
-        if self._namespaces is not None:
-            return self._namespaces
-        result = self.client.api('query', meta='siteinfo', siprop="namespaces|namespacealiases")
-        ns_aliases = {}
+        return self._namespace_data()[0]
+
+
+    def _namespace_data(self):
+        """Return the list of `Namespace`s and a dict of lowercase name -> `Namespace`.
+
+        The dict contains the localized and canonical names and the aliases of
+        all namespaces. Both are fetched with one siteinfo query and cached together.
+        """
+        data = self._cache_get('namespaces', _CACHE_TTL)
+        if data is not None:
+            return data
+        result = self.api('query', meta='siteinfo', siprop="namespaces|namespacealiases")
+        ns_aliases = defaultdict(list)
         for alias in result['query']['namespacealiases']:
-            alias_key = str(alias['id'])
-            if alias_key not in ns_aliases:
-                ns_aliases[alias_key] = []
-            ns_aliases[alias_key].append(alias['*'])
+            ns_aliases[str(alias['id'])].append(alias['*'])
         ret = []
+        by_name = {}
         for ns_str, ns_data in result['query']['namespaces'].items():
-            ns = int(ns_str)
-            ret.append(Namespace(id_number=ns, name=ns_data['*'], canonical_name=ns_data.get('canonical'), aliases=ns_aliases.get(ns_str)))
-        self._namespaces = ret
-        return ret
+            ns = Namespace(id_number=int(ns_str), name=ns_data['*'], canonical_name=ns_data.get('canonical'), aliases=ns_aliases.get(ns_str))
+            ret.append(ns)
+            for name in (ns.name, ns.canonical_name, *ns.aliases):
+                if name is not None:
+                    by_name[name.lower()] = ns
+        data = (ret, by_name)
+        self._cache_set('namespaces', data)
+        return data
 
 
     def save(self, page: Page, text, summary='', minor=False, bot=True, section=None, **kwargs):
@@ -79,6 +268,32 @@ class WikiClient(Site):
         return page.delete(reason, watch, unwatch, oldimage)
 
 
+    async def save_many_async(self, items, concurrency: int = 8, **kwargs):
+        """Save many pages concurrently.
+
+        `items` is an iterable of `(page, text)` pairs; the keyword arguments are
+        passed on to every `save` call. At most `concurrency` edits are in
+        progress at the same time.
+
+        Returns a list with the result of each `save` call, in the order of
+        `items`. Exceptions are returned in that list instead of being raised,
+        so that a single failed edit doesn't abort the rest of the batch.
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def save_one(page: Page, text):
+            async with semaphore:
+                return await self.save_async(page, text, **kwargs)
+
+        return await asyncio.gather(*(save_one(page, text) for page, text in items), return_exceptions=True)
+
+
+    def save_many(self, items, concurrency: int = 8, **kwargs):
+        """Synchronous version of `save_many_async`, for use outside of an event loop."""
+        return asyncio.run(self.save_many_async(items, concurrency, **kwargs))
+
+
     def target(self, name: str):
         """Return the name of a page's redirect target.
 
@@ -89,10 +304,28 @@ class WikiClient(Site):
 
         Returns
         -------
-        - The name of the target page of the redirect.
+        - The name of the target page of the redirect, or the (normalized) name
+          of the page itself if it is not a redirect.
         """
 
-        return self.pages[name].resolve_redirect().name
+        return self.target_many([name])[name]
+
+
+    def target_many(self, names: list, chunk_size: int = None):
+        """Like `target`, but for several pages at once.
+
+        This only makes one API call per `chunk_size` pages (by default, the
+        maximum for the current user, see `get_last_revs`).
+
+        Returns
+        -------
+        A dict of page name -> name of the redirect target.
+        """
+
+        return {
+            title: redirect['to'] if redirect else normalized_title
+            for title, normalized_title, redirect in self._query_redirects(list(dict.fromkeys(names)), chunk_size)
+        }
 
 
     def fullurl(self, **kwargs):
@@ -107,13 +340,9 @@ class WikiClient(Site):
         >>> site.fullurl(**{'from': 123})
         """
 
-        return urllib.parse.urlunsplit((
-            self.scheme,
-            self.host,
-            self.path + 'index' + self.ext,
-            urllib.parse.urlencode(kwargs, quote_via=urllib.parse.quote),
-            ''
-        ))
+        if not kwargs:
+            return self._index_url
+        return f'{self._index_url}?{urllib.parse.urlencode(kwargs, quote_via=urllib.parse.quote)}'
 
 
     def get_last_rev(self, page: Page, log, query='revid'):
@@ -123,28 +352,142 @@ class WikiClient(Site):
         ----------
         1. page : mwclient.Page
             - The name of the page to get the revision for.
+        2. log
+            - The function to log errors with.
+        3. query : str
+            - The revision property to return: ``revid``, ``parentid``, or ``timestamp``.
         """
+        if query not in _LAST_REV_PROPS:
+            raise ValueError(f'invalid query "{query}", must be one of {sorted(_LAST_REV_PROPS)}')
         try:
-            api_result = self.api('query', prop='revisions', titles=page.name, rvlimit=1) # https://terraria.gamepedia.com/api.php?action=query&prop=revisions&titles=User:Rye_Greenwood/Sandbox&rvlimit=1
-        except KeyboardInterrupt:
-            raise
-        except:
+            # https://terraria.wiki.gg/api.php?action=query&prop=revisions&titles=User:Rye_Greenwood/Sandbox&rvlimit=1&rvprop=ids|timestamp
+            api_result = self.api('query', prop='revisions', titles=page.name, rvlimit=1, rvprop='ids|timestamp')
+        except _API_ERRORS:
             log('\n***ERROR*** while getting last revision!')
             log(exc_info=True, s='Error message:\n')
             return None
-        page_ids = api_result['query']['pages']
-        page_id = -1
-        for id in page_ids:
-            page_id = id
+        page_ids = api_result.get('query', {}).get('pages', {})
+        page_id = next(iter(page_ids), None)
         try:
             rev = page_ids[page_id]['revisions'][0][query]
-        except KeyError: # specified key doesn't exist, either because of invalid "query" arg or nonexistent page
+        except KeyError: # nonexistent page
             rev = None
 
         # rev = [revision for revision in page.revisions(limit=1, prop='ids')][0]['revid'] # this is a shorter alternative, but much much slower, since the limit=1 isn't recognized for some reason, and instead all revs are gathered
         return rev
 
 
+    def get_last_rev_if_modified(self, page: Page, since_revid: int):
+        """Check whether a page has been edited since the revision `since_revid`.
+
+        This is cheaper than `get_last_rev`, since the page info (``prop=info``)
+        already contains the latest revision id.
+
+        Parameters
+        ----------
+        1. page : mwclient.Page
+            - The page to check.
+        2. since_revid : int
+            - The latest revision id known to the caller.
+
+        Returns
+        -------
+        A tuple ``(modified, latest revision id)``, where ``modified`` is whether the
+        latest revision id differs from `since_revid`; or ``None`` if the page
+        doesn't exist (anymore) or the title is invalid.
+
+        Raises
+        ------
+        - The errors of the API call, unlike `get_last_rev`, so that a failed
+          check can't be mistaken for an unmodified page.
+        """
+        api_result = self.api('query', prop='info', titles=page.name)
+        page_ids = api_result.get('query', {}).get('pages', {})
+        page_data = page_ids.get(next(iter(page_ids), None), {})
+        revid = page_data.get('lastrevid')
+        if revid is None:  # missing page or invalid title
+            return None
+        return (revid != since_revid, revid)
+
+
+    def get_last_revs(self, pages: list, query='revid', chunk_size: int = None):
+        """Get the latest revision (rev) id or timestamp for each of the given pages.
+
+        Unlike calling `get_last_rev` for each page, this only makes one API call per
+        `chunk_size` pages.
+
+        Parameters
+        ----------
+        1. pages : list[mwclient.Page]
+            - The pages to get the revisions for.
+        2. query : str
+            - The revision property to return: ``revid``, ``parentid``, or ``timestamp``.
+        3. chunk_size : int
+            - The number of pages per API call (at most 50, or 500 with the ``apihighlimits`` right).
+              By default, the maximum for the current user.
+
+        Returns
+        -------
+        A dict of page name -> revision id or timestamp (``None`` if the page doesn't exist).
+        """
+
+        if query not in _LAST_REV_PROPS:
+            raise ValueError(f'invalid query "{query}", must be one of {sorted(_LAST_REV_PROPS)}')
+        last_revs = {page.name: None for page in pages}
+        for title, page_data in self._query_titles(list(last_revs), chunk_size, prop='revisions', rvprop='ids|timestamp'):
+            revisions = page_data.get('revisions')
+            if revisions:
+                last_revs[title] = revisions[0].get(query)
+        return last_revs
+
+
+    def pages_exist(self, pagenames: list, chunk_size: int = None):
+        """Check for each of the given pages whether it exists.
+
+        This only makes one API call per `chunk_size` pages (by default, the
+        maximum for the current user, see `get_last_revs`).
+
+        Returns
+        -------
+        A dict of page name -> ``True`` or ``False``.
+        """
+
+        exist = dict.fromkeys(pagenames, False)
+        for title, page_data in self._query_titles(list(exist), chunk_size, prop='info'):
+            exist[title] = 'missing' not in page_data and 'invalid' not in page_data
+        return exist
+
+
+    def _query_titles(self, titles: list, chunk_size: int, **kwargs):
+        """Query the `titles` in chunks of `chunk_size` and yield `(title, page data)` pairs.
+
+        `title` is the title as given in `titles`, even if the API normalized it
+        (e.g. ``foo`` to ``Foo``). The keyword arguments are passed to the API.
+        """
+
+        for chunk in self._title_chunks(titles, chunk_size):
+            api_result = self.api('query', titles='|'.join(chunk), **kwargs).get('query', {})
+            normalized = {n['from']: n['to'] for n in api_result.get('normalized', [])}
+            # API title -> requested titles (several titles may be normalized to the same one)
+            requested = {}
+            for title in chunk:
+                requested.setdefault(normalized.get(title, title), []).append(title)
+            for page_data in api_result.get('pages', {}).values():
+                for title in requested.get(page_data.get('title'), []):
+                    yield title, page_data
+
+
+    def _title_chunks(self, titles: list, chunk_size: int = None):
+        """Split the `titles` into chunks of `chunk_size` titles, one chunk per API query.
+
+        With a `chunk_size` of `None`, the chunks are as large as the API allows
+        for the current user: 500 titles with the ``apihighlimits`` right, else 50.
+        """
+        if chunk_size is None:
+            chunk_size = 500 if 'apihighlimits' in self.rights else 50
+        return [titles[i:i + chunk_size] for i in range(0, len(titles), chunk_size)]
+
+
     def find_summary_in_revs(self, page: Page, summary: str, log, user='Ryebot', limit=5, for_undo=False):
         """Get the revision ID of a revision with a specified summary from the specified user in a specified number of last revisions.
 
@@ -155,7 +498,7 @@ class WikiClient(Site):
         2. summary : str
     	    - The edit summary to find.
         3. limit : int
-            - The maximum number of revisions to search, starting from the latest
+            - The maximum number of revisions by ``user`` to search, starting from the latest
         4. for_undo : bool
             - Whether this method is called for an undo of that revision.
 
@@ -168,27 +511,25 @@ class WikiClient(Site):
         """
 
         try:
-            api_result = self.client.api('query', prop='revisions', titles=page.name, rvlimit=limit)
-        except KeyboardInterrupt:
-            raise
-        except:
+            # let the server filter by user, and only return the properties we need
+            api_result = self.api('query', prop='revisions', titles=page.name, rvlimit=limit,
+                                  rvuser=user, rvprop='ids|comment')
+        except _API_ERRORS:
             log('\n***ERROR*** while getting list of revisions!')
             log(exc_info=True, s='Error message:\n')
             return None
 
-        page_id = None
-        page_ids = api_result['query']['pages']
-        for p_id in page_ids:
-            page_id = p_id
+        page_ids = api_result.get('query', {}).get('pages', {})
+        page_id = next(iter(page_ids), None)
 
         if not page_id:
             return None
 
-        revisions_to_search = page_ids[page_id]['revisions']
+        revisions_to_search = page_ids[page_id].get('revisions', [])
         revid = ''
         prev_revid = ''
         for rev in revisions_to_search:
-            if rev['comment'] == summary and rev['user'] == user:
+            if rev['comment'] == summary:
                 revid = rev['revid']
                 prev_revid = rev['parentid']
                 break
@@ -209,116 +550,143 @@ class WikiClient(Site):
 
         Returns
         -------
-        The list of IDs as strings each.
+        The list of IDs as strings each, in the order of the input, with each ID
+        only once. Names can be localized or canonical names or aliases of a
+        namespace (case-insensitive); unknown names are skipped.
         """
 
-        result_namespaces = []
         try:
-            api_result = self.client.api('query', meta='siteinfo', siprop='namespaces') # https://terraria.gamepedia.com/api.php?action=query&meta=siteinfo&siprop=namespaces
-        except KeyboardInterrupt:
-            raise
-        except:
+            by_name = self._namespace_data()[1]
+        except _API_ERRORS:
             log('\n***ERROR*** while list of all namespaces!')
             log(exc_info=True, s='Error message:\n')
             return None
 
-        all_namespaces = api_result['query']['namespaces']
-        for ns in all_namespaces:
-            if all_namespaces[ns]['*'] in namespaces:
-                result_namespaces.append(ns)
+        # several names (e.g. a name and its alias) may belong to the same namespace
+        ids = {}
+        for name in namespaces:
+            ns = by_name.get(name.lower())
+            if ns is not None:
+                ids[str(ns.id)] = None
+        return list(ids)
 
-        return result_namespaces
+
+    def _siteinfo_general(self) -> dict:
+        """Return the general site information (``meta=siteinfo&siprop=general``).
+
+        mwclient queries it when initializing the client, so this only makes an
+        API call if the client was created with ``do_init=False``.
+        """
+        if self.initialized:
+            return self.site
+        api_result = self.api('query', meta='siteinfo', siprop='general')
+        return api_result.get('query', {}).get('general', {})
 
 
     def get_current_servername(self):
         """Return the server name of the current wiki."""
-        api_result = self.api('query', meta='siteinfo', siprop='general')
-        return api_result.get('query', {}).get('general', {}).get('servername', '')
+        return self._siteinfo_general().get('servername', '')
 
 
-    def get_current_wiki_name(self):
-        """Return the name of the current host."""
-        # this function is mainly intended to be overridden in subclasses
-        return self.get_current_servername()
+    def get_current_wiki_name(self) -> str:
+        """Return the name of the current host.
+
+        The `HOST_SUFFIX` of the class is omitted and `/<lang>` is appended,
+        if the language is not English.
+
+        Example: For `terraria.wiki.gg/de` with a `HOST_SUFFIX` of `.wiki.gg`,
+        return `terraria/de`.
+
+        The result is cached, since the wiki doesn't change during the lifetime
+        of the client.
+        """
+
+        sitename = self._cache_get('wiki_name')
+        if sitename is not None:
+            return sitename
+
+        siteinfo = self._siteinfo_general()
+        sitename = siteinfo.get('servername', '').removesuffix(self.HOST_SUFFIX)
+        sitelang = siteinfo.get('lang')
+        if sitelang and sitelang != "en":
+            sitename = f'{sitename}/{sitelang}'
+
+        self._cache_set('wiki_name', sitename)
+        return sitename
+
+
+    def invalidate_wiki_name_cache(self):
+        """Make the next `get_current_wiki_name` call query the wiki again."""
+        self._cache.pop('wiki_name', None)
 
 
     def get_current_wiki_user(self):
-        """Return the name of the currently logged in user."""
+        """Return the name of the currently logged in user.
+
+        The result is cached for a few minutes, and reset on `login`.
+        """
+        wiki_user = self._cache_get('wiki_user', _CACHE_TTL)
+        if wiki_user is not None:
+            return wiki_user
         api_result = self.api('query', meta='userinfo')
         wiki_user = api_result.get('query', {}).get('userinfo', {}).get('name', '')
+        self._cache_set('wiki_user', wiki_user)
         return wiki_user
 
 
     def get_csrf_token(self, log):
-        """Get a CSRF token for a POST request."""
+        """Get a CSRF token for a POST request.
+
+        The token is cached, and reset on `login` and when the wiki rejects a
+        token. Once the cached token is older than `_CSRF_TOKEN_TTL` seconds, it
+        is still returned, but a new one is fetched in the background for the
+        following calls.
+        """
 
+        cached = self._cache.get('csrf_token')
+        if cached is None:
+            return self._fetch_csrf_token(log)
+        cache_time, token = cached
+        if time.monotonic() - cache_time >= _CSRF_TOKEN_TTL:
+            self._refresh_csrf_token_in_background(log)
+        return token
+
+
+    def _fetch_csrf_token(self, log):
+        """Query a new CSRF token and cache it."""
         try:
-            api_result = self.client.api('query', meta='tokens')
-        except KeyboardInterrupt:
-            raise
-        except:
+            api_result = self.api('query', meta='tokens')
+        except _API_ERRORS:
             log('\n***ERROR*** while getting CSRF token!')
             log(exc_info=True, s='Error message:\n')
             return None
-        token = api_result['query']['tokens']['csrftoken']
+        token = api_result.get('query', {}).get('tokens', {}).get('csrftoken')
+        if token is not None:
+            self._cache_set('csrf_token', token)
         return token
 
 
-    def api_continue__recursive(self, action: str, continue_name: str='', i: int=0, **kwargs):
-        """
-        Provides an API call with recursive, thus unlimited "continue" capability (e.g. for when the number of category members may exceed the bot limit (5000) but we want to get all >5000 of them).
-        Returns an array with the contents of each "action" (e.g. "query") call.
-
-        Parameters
-        ----------
-        1. action : str
-            - API action module (e.g. ``query``).
-        2. continue_name: str
-            - Name of the ``continue`` attribute for the specified action (e.g. ``cmcontinue``). Defaults to first element in the ``continue`` array of the API result.
-        3. i: int
-            - Internally used by the recursion for debug. Do not use from outside!
+    def _refresh_csrf_token_in_background(self, log):
+        """Fetch a new CSRF token in a separate thread, unless that is already happening."""
+        if not self._csrf_refresh_lock.acquire(blocking=False):
+            return
 
-        Raises
-        ------
-        - ``ApiContinueError`` (with ``__cause__`` set to the actual exception)
-        """
+        def refresh():
+            try:
+                self._fetch_csrf_token(log)
+            finally:
+                self._csrf_refresh_lock.release()
 
-        i += 1
-        try:
-            api_result = self.api(action, **kwargs)
-        except Exception as exc:
-            raise ApiContinueError(i, action, kwargs) from exc
-
-        if 'continue' not in api_result:  # reached top of the stack
-            if i == 1:  # still in the first call, no continues were necessary at all
-                return [api_result[action]]
-            else:
-                return api_result[action]
-        else:
-            if not continue_name:
-                continue_name = list(api_result['continue'].keys())[0]
-            if continue_name not in api_result['continue']:
-                raise RuntimeError(
-                    f'The "continue_name" of "{continue_name}" was not in the API call!'
-                )
-            # add the continue parameter to the next API call
-            kwargs[continue_name] = api_result['continue'][continue_name]
-            # do recursion
-            next_api_result = self.api_continue(action, continue_name, i, **kwargs)
-            if next_api_result:
-                if type(next_api_result) != list:
-                    next_api_result = [next_api_result]
-                result = next_api_result
-                result.append(api_result[action])
-                return result
-            else:  # error during API call
-                return
+        threading.Thread(target=refresh, daemon=True).start()
 
 
     def api_continue(self, action: str, continue_name: str='', **kwargs):
         """
         Provides an API call with unlimited "continue" capability (e.g. for when the number of category members may exceed the bot limit (5000) but we want to get all >5000 of them).
-        Returns an array with the contents of each "action" (e.g. "query") call.
+        Returns an array with the contents of each "action" (e.g. "query") call, in the order of the calls.
+        The calls are made one after another in a loop, so there is no limit on their number.
+
+        Use ``api_continue_iter()`` instead to process the results while they arrive, without keeping all of them in memory.
 
         Parameters
         ----------
@@ -329,11 +697,25 @@ class WikiClient(Site):
 
         Raises
         ------
-        - ``ApiContinueError`` (with ``__cause__`` set to the actual exception)
+        - ``ApiContinueError`` if an API call fails because of the wiki or the network
+          (with ``__cause__`` set to the actual exception); other exceptions are not wrapped
+        """
+
+        return list(self.api_continue_iter(action, continue_name, **kwargs))
+
+    # former recursive implementation, kept as an alias for backward compatibility
+    api_continue__recursive = api_continue
+
+
+    def api_continue_iter(self, action: str, continue_name: str='', **kwargs):
+        """
+        Generator version of ``api_continue()``: yields the contents of each "action" (e.g. "query") call as soon as it is received.
+
+        The next API call is only made when the next item is requested, so only one result is held in memory at a time.
+        Parameters and exceptions are the same as for ``api_continue()``.
         """
 
         user_input_continue_name = continue_name
-        api_results = []
         i = -1
         while True:
             i += 1
@@ -341,41 +723,117 @@ class WikiClient(Site):
             # do API query
             try:
                 api_result = self.api(action, **kwargs)
-            except Exception as exc:
+            except _API_ERRORS as exc:
                 raise ApiContinueError(i, action, kwargs) from exc
-            api_results.append(api_result[action])
-
-            if 'continue' not in api_result:
-                break
+            # keep only the parts that are still needed, so that the rest of the
+            # response can be freed while the caller processes the batch
+            batch = api_result[action]
+            continue_data = api_result.get('continue')
+            del api_result
+            yield batch
+            del batch
+
+            if continue_data is None:
+                return
 
             # determine the "continue" key for the next API call
             if not continue_name:
-                continue_name = list(api_result['continue'].keys())[0]
+                continue_name = next(iter(continue_data))
 
             # invalid "continue_name" parameter passed to this function?
-            if user_input_continue_name and user_input_continue_name not in api_result['continue']:
+            if user_input_continue_name and user_input_continue_name not in continue_data:
                 error_str = f'"{user_input_continue_name}" not found'
                 if continue_name:
                     error_str += f', did you mean "{continue_name}"?'
                 raise RuntimeError(error_str)
 
             # add the "continue" parameter to the next API call
-            kwargs[continue_name] = api_result['continue'][continue_name]
+            kwargs[continue_name] = continue_data[continue_name]
+
+
+    async def api_continue_iter_async(self, action: str, continue_name: str='', **kwargs):
+        """
+        Asynchronous version of ``api_continue_iter()``, for use with ``async for``.
 
-        return api_results
+        Each API call needs the "continue" value of the previous one, so the calls can't be made in parallel.
+        Instead, the next call is started before a result is yielded, so that it is in progress while the caller processes the result.
+        Parameters and exceptions are the same as for ``api_continue()``.
+        """
+
+        results = self.api_continue_iter(action, continue_name, **kwargs)
+        done = object()
+        pending = asyncio.ensure_future(asyncio.to_thread(next, results, done))
+        try:
+            while True:
+                result = await pending
+                if result is done:
+                    return
+                pending = asyncio.ensure_future(asyncio.to_thread(next, results, done))
+                yield result
+        finally:
+            # the caller stopped early; the call that is in progress is discarded
+            pending.cancel()
 
 
     def redirects_to_inclfragment(self, pagename: str):
         """Similar to ``mwclient.Site.redirects_to()``, but also returns the fragment of the redirect target."""
 
-        api_result = self.client.api('query', prop='pageprops', titles=pagename, redirects='')
-        if 'redirects' in api_result['query']:
-            for page in api_result['query']['redirects']:
-                if page['from'] == pagename:
-                    if 'tofragment' in page:
-                        return (page['to'], page['tofragment'])
-                    else:
-                        return (page['to'], None)
+        return self.redirects_to_inclfragment_many([pagename])[pagename]
+
+
+    def redirects_to_inclfragment_many(self, pagenames: list, chunk_size: int = None):
+        """Like `redirects_to_inclfragment`, but for several pages at once.
+
+        This only makes one API call per `chunk_size` pages (by default, the
+        maximum for the current user, see `get_last_revs`).
+
+        Returns
+        -------
+        A dict of page name -> ``(target, fragment)``. Both are ``None`` if the page
+        is not a redirect; the fragment is ``None`` if the redirect has none.
+        """
+
+        targets = {}
+        for title, _, redirect in self._query_redirects(list(dict.fromkeys(pagenames)), chunk_size):
+            targets[title] = (redirect['to'], redirect.get('tofragment')) if redirect else (None, None)
+        return targets
+
+
+    def _query_redirects(self, titles: list, chunk_size: int = None):
+        """Query the `titles` in chunks of `chunk_size` and yield `(title, normalized title, redirect)` tuples.
+
+        `redirect` is the entry of the API's ``redirects`` list for the title (with
+        the keys ``from``, ``to``, and possibly ``tofragment``), or ``None`` if the
+        page is not a redirect.
+        """
+
+        for chunk in self._title_chunks(titles, chunk_size):
+            api_result = self.api('query', titles='|'.join(chunk), redirects='').get('query', {})
+            normalized = {n['from']: n['to'] for n in api_result.get('normalized', [])}
+            redirects = {r['from']: r for r in api_result.get('redirects', [])}
+            for title in chunk:
+                normalized_title = normalized.get(title, title)
+                yield title, normalized_title, redirects.get(normalized_title)
+
+
+async def gather_api_continue(clients, action: str, continue_name: str='', concurrency: int = 32, **kwargs):
+    """Run the same ``api_continue()`` call on several wikis concurrently.
+
+    `clients` is an iterable of `WikiClient`s, e.g. one per wiki of a farm. At
+    most `concurrency` calls are in progress at the same time; since each call
+    runs in a worker thread, a higher value than the number of threads of the
+    event loop's default executor doesn't help.
+
+    Returns a list with the result of each call, in the order of `clients`.
+    Exceptions are returned in that list instead of being raised, so that a
+    single unreachable wiki doesn't abort the rest.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def api_continue_one(client: WikiClient):
+        async with semaphore:
+            return await client.api_continue_async(action, continue_name, **kwargs)
 
-        return (None, None)
+    return await asyncio.gather(*(api_continue_one(client) for client in clients), return_exceptions=True)
 